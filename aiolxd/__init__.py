@@ -1,7 +1,18 @@
 """AsyncIO LXD API for Python 3."""
 
 from . import entities, exceptions, lxd, utils
+from .entities.abc import fetch_all
 from .lxd import LXD
-from .transport import AbstractTransport, AsyncTransport
+from .transport import AbstractTransport, AsyncTransport, install_uvloop
 
-__all__ = ["LXD", "AbstractTransport", "AsyncTransport", "entities", "exceptions", "utils", "lxd"]
+__all__ = [
+    "LXD",
+    "AbstractTransport",
+    "AsyncTransport",
+    "fetch_all",
+    "install_uvloop",
+    "entities",
+    "exceptions",
+    "utils",
+    "lxd",
+]
@@ -18,7 +18,7 @@ class ApiEndpointGroup(ABC):
     ...         ...
     ...
     ...     async def create(self, instance: InstanceEntity) -> InstanceEntity:
-    ...         resp = self.transport.instances.post(instance.dict())
+    ...         resp = self.transport.instances.post(instance.model_dump())
     ...         ...
     ...
     >>> instance = InstanceGroup(transport)
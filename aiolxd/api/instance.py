@@ -1,21 +1,128 @@
-from typing import List
+import asyncio
+import math
+from typing import Any, Dict, List, Optional
 
+from ..entities.abc import AbstractFetchBatcher, LazyEntity
 from ..entities.instance import (
     InstanceCreateRequest,
     InstanceEntity,
     InstanceSource,
 )
 from ..entities.response import AsyncResponse, SyncResponse
-from ..utils import ensure_response
+from ..transport import AbstractTransport
+from ..utils import ensure_response, retrieve_exception
 from .abc import ApiEndpointGroup
 
 
+class _InstanceFetchBatcher(AbstractFetchBatcher):
+    """Coalesce fetches of unfetched instances into one recursive listing.
+
+    Fetches requested within `window` seconds of each other are resolved by
+    a single `GET /1.0/instances?recursion=1` when at least `min_batch` of
+    them are pending. Fewer fetches, or an instance missing from the
+    listing, are fetched by their operation as usual.
+    """
+
+    def __init__(self, transport: AbstractTransport, window: float, min_batch: int) -> None:
+        self.transport = transport
+        self.window = window
+        self.min_batch = min_batch
+        self._instances = transport.instances
+        self._pending: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+
+    async def fetch(self, entity: LazyEntity) -> None:
+        operation = entity.operation
+        if not operation:
+            raise RuntimeError("Operation not set")
+        future = self._pending.get(operation)
+        if future is None:
+            future = self._pending[operation] = asyncio.get_running_loop().create_future()
+            future.add_done_callback(retrieve_exception)
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush())
+        # The future is shared, cancelling one waiter must not cancel it
+        entity.fill(await asyncio.shield(future))
+
+    async def _fetch_one(self, operation: str) -> Dict[str, Any]:
+        resp = await self.transport.get(operation)
+        resp = ensure_response(resp, dict, SyncResponse)
+        if not isinstance(resp.metadata, dict):
+            raise TypeError("Expected dict, got {!r}".format(resp.metadata))
+        return resp.metadata
+
+    async def _resolve(self, pending: Dict[str, "asyncio.Future[Dict[str, Any]]"]) -> None:
+        found: Dict[str, Dict[str, Any]] = {}
+        if len(pending) >= self.min_batch:
+            resp = await self._instances(recursion=True)
+            resp = ensure_response(resp, list, SyncResponse)
+            if not isinstance(resp.metadata, list):
+                raise TypeError("Expected list, got {!r}".format(resp.metadata))
+            found = {f"/1.0/instances/{item['name']}": item for item in resp.metadata}
+        missing = []
+        for operation, future in pending.items():
+            if operation in found:
+                future.set_result(found[operation])
+            else:
+                missing.append(operation)
+        results = await asyncio.gather(*map(self._fetch_one, missing), return_exceptions=True)
+        for operation, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                pending[operation].set_exception(result)
+            else:
+                pending[operation].set_result(result)
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        try:
+            await self._resolve(pending)
+        except Exception as err:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(err)
+
+
 class InstanceGroup(ApiEndpointGroup):
-    """API endpoint group for instances."""
+    """API endpoint group for instances.
+
+    Fetch batching is off by default. When `fetch_batch_window` is set (in
+    seconds), instances listed without recursion get a fetch batcher: when
+    at least `fetch_batch_threshold` of the listed instances are fetched
+    within the window, they are served by one recursive listing instead of
+    one request each. Every fetch of such an instance waits for the window.
+    """
+
+    def __init__(
+        self,
+        transport: AbstractTransport,
+        api_extensions: List[str],
+        fetch_batch_window: Optional[float] = None,
+        fetch_batch_threshold: float = 0.25,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the endpoint group."""
+        super().__init__(transport, api_extensions, **kwargs)
+        self.fetch_batch_window = fetch_batch_window
+        self.fetch_batch_threshold = fetch_batch_threshold
+        # Every endpoint of the group lives under /1.0/instances
+        self._instances = transport.instances
+
+    def _get_fetch_batcher(self, size: int) -> Optional[_InstanceFetchBatcher]:
+        """Get a fetch batcher for a listing of `size` instances, if it is worth one."""
+        if self.fetch_batch_window is None:
+            return None
+        # A recursive listing returns every instance, it only pays off when
+        # a good part of them is fetched
+        min_batch = max(2, math.ceil(size * self.fetch_batch_threshold))
+        if min_batch > size:
+            return None
+        return _InstanceFetchBatcher(self.transport, self.fetch_batch_window, min_batch)
 
     async def get(self, name: str) -> InstanceEntity:
         """Get instance by name."""
-        resp = await self.transport.instances.slash(name).get()
+        resp = await self._instances.slash(name).get()
         resp = ensure_response(resp, dict, SyncResponse)
         if not isinstance(resp.metadata, dict):
             raise TypeError("Expected dict, got {!r}".format(resp.metadata))
@@ -23,13 +130,14 @@ class InstanceGroup(ApiEndpointGroup):
 
     async def list(self, recursion: bool = False) -> List[InstanceEntity]:
         """List all instances."""
-        resp = await self.transport.instances(recursion=recursion)
+        resp = await self._instances(recursion=recursion)
         resp = ensure_response(resp, list, SyncResponse)
         if not isinstance(resp.metadata, list):
             raise TypeError("Expected list, got {!r}".format(resp.metadata))
         if recursion:
-            return [InstanceEntity(self.transport, data=item) for item in resp.metadata]
-        return [InstanceEntity(self.transport, operation=item) for item in resp.metadata]
+            return InstanceEntity.from_list(self.transport, resp.metadata)
+        batcher = self._get_fetch_batcher(len(resp.metadata))
+        return InstanceEntity.from_operations(self.transport, resp.metadata, batcher)
 
     async def create(
         self,
@@ -47,12 +155,12 @@ class InstanceGroup(ApiEndpointGroup):
             source=InstanceSource(alias=source, type=source_type),
             type=type_,
         )
-        resp = await self.transport.instances.post(data=body.dict())
+        resp = await self._instances.post(data=body.model_dump())
         resp = ensure_response(resp, dict, AsyncResponse)
         return resp
 
     async def delete(self, name: str) -> AsyncResponse:
         """Delete instance by name."""
-        resp = await self.transport.instances.slash(name).delete()
+        resp = await self._instances.slash(name).delete()
         resp = ensure_response(resp, dict, AsyncResponse)
         return resp
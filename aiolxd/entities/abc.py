@@ -1,11 +1,27 @@
-from typing import Any, Dict, Optional
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
 
-from pydantic import BaseModel
-from pydantic.error_wrappers import ValidationError
+from pydantic import BaseModel, PrivateAttr, ValidationError
 
 from ..exceptions import AioLXDValidationError
 from ..transport import AbstractTransport
 
+T = TypeVar("T", bound="LazyEntity")
+
+
+class AbstractFetchBatcher(ABC):
+    """Base class for fetch batchers.
+
+    A batcher collects fetches of unfetched entities and resolves them
+    with fewer requests than one per entity.
+    """
+
+    @abstractmethod
+    async def fetch(self, entity: "LazyEntity") -> None:
+        """Fetch the entity, possibly together with other pending entities."""
+        pass
+
 
 class LazyEntity(BaseModel):
     """Base class for entities that are lazily fetched from the server.
@@ -30,18 +46,77 @@ class LazyEntity(BaseModel):
         >>> entity = MyEntity(None, data={"foo": "bar"})
         >>> entity.foo
         'bar'
+        >>>
+        >>> entity = MyEntity(None, data=b'{"foo": "bar"}')
+        >>> entity.foo
+        'bar'
     """
 
+    _transport: AbstractTransport = PrivateAttr()
+    _operation: Optional[str] = PrivateAttr(default=None)
+    _is_fetched: bool = PrivateAttr(default=False)
+    _batcher: Optional[AbstractFetchBatcher] = PrivateAttr(default=None)
+
     def __init__(
-        self, transport: AbstractTransport, operation: Optional[str] = None, data: Optional[Dict[str, Any]] = None
+        self,
+        transport: AbstractTransport,
+        operation: Optional[str] = None,
+        data: Optional[Union[bytes, str, Dict[str, Any]]] = None,
+        batcher: Optional[AbstractFetchBatcher] = None,
     ) -> None:
-        self._transport = transport
-        self._operation = operation
-        self._is_fetched = False
-
+        self._init_state(transport, operation, batcher)
         if data is not None:
             self.fill(data)
 
+    def _init_state(
+        self, transport: AbstractTransport, operation: Optional[str], batcher: Optional[AbstractFetchBatcher]
+    ) -> None:
+        """Set up the model state of an unfetched entity.
+
+        Pydantic initialization is deferred until the data is available, so
+        the model state is set up by hand here and completed by fill().
+        """
+        object.__setattr__(self, "__pydantic_fields_set__", set())
+        object.__setattr__(self, "__pydantic_extra__", None)
+        object.__setattr__(
+            self,
+            "__pydantic_private__",
+            {"_transport": transport, "_operation": operation, "_is_fetched": False, "_batcher": batcher},
+        )
+
+    @classmethod
+    def from_operations(
+        cls: Type[T],
+        transport: AbstractTransport,
+        operations: List[str],
+        batcher: Optional[AbstractFetchBatcher] = None,
+    ) -> List[T]:
+        """Create unfetched entities from a list of operations.
+
+        This is the constructor for listings without recursion. It skips
+        the argument handling of __init__ and only sets up the model state.
+        """
+        entities = []
+        for operation in operations:
+            entity = cls.__new__(cls)
+            entity._init_state(transport, operation, batcher)
+            entities.append(entity)
+        return entities
+
+    @classmethod
+    def _from_schema(cls: Type[T], transport: AbstractTransport, schema: BaseModel) -> T:
+        """Create a fetched entity from an already validated model of its fields.
+
+        The field values are taken over as they are, without validating
+        them again and without going through fill().
+        """
+        entity = cls.__new__(cls)
+        entity._init_state(transport, None, None)
+        object.__setattr__(entity, "__dict__", schema.__dict__)
+        object.__setattr__(entity, "__pydantic_fields_set__", schema.__pydantic_fields_set__)
+        entity._is_fetched = True
+        return entity
+
     @property
     def operation(self) -> Optional[str]:
         return self._operation
@@ -50,16 +125,24 @@ class LazyEntity(BaseModel):
     def is_fetched(self) -> bool:
         return self._is_fetched
 
-    def fill(self, data: Dict[str, Any]) -> None:
+    def fill(self, data: Union[bytes, str, Dict[str, Any]]) -> None:
         """Fill the object with the given data.
 
-        This is used when recursion is enabled.
+        This is used when recursion is enabled. Raw JSON is parsed and
+        validated in a single pass, without building an intermediate dict.
         """
+        private = self.__pydantic_private__
         try:
-            super().__init__(**data)
-            self._is_fetched = True
+            if isinstance(data, (bytes, str)):
+                self.__pydantic_validator__.validate_json(data, self_instance=self)
+            else:
+                self.__pydantic_validator__.validate_python(data, self_instance=self)
         except ValidationError as err:
             raise AioLXDValidationError(err)
+        finally:
+            # Validating in place resets private attributes, so put them back
+            object.__setattr__(self, "__pydantic_private__", private)
+        self._is_fetched = True
 
     async def update(self) -> None:
         """Update the object from the server."""
@@ -71,16 +154,51 @@ class LazyEntity(BaseModel):
         self.fill(resp.metadata)
 
     async def fetch(self) -> None:
-        """Fetch the object if it hasn't been fetched yet."""
+        """Fetch the object if it hasn't been fetched yet.
+
+        If the entity has a batcher, the fetch is handed to it, so that
+        concurrent fetches can share a request.
+        """
         if not self._is_fetched:
-            await self.update()
+            if self._batcher is not None:
+                await self._batcher.fetch(self)
+            else:
+                await self.update()
 
     def __repr__(self) -> str:
         return self.__class__.__name__ + f"({self if self._is_fetched else ('Unfetched ' + str(self._operation))})"
 
-    def __setattr__(self, name: str, value: Any) -> None:
-        # if name starts with _, set it directly
-        # this is used to set the _transport and _operation attributes
-        if name.startswith("_"):
-            return object.__setattr__(self, name, value)
-        return super().__setattr__(name, value)
+
+async def fetch_all(entities: Iterable[LazyEntity], *, concurrency: int = 16) -> None:
+    """Fetch all unfetched entities concurrently.
+
+    Use this instead of awaiting `fetch()` on each entity in a loop, which
+    makes one round-trip after another. At most `concurrency` fetches are
+    in flight at once. Entities with a fetch batcher are all handed to it
+    together, since it coalesces them into a few requests anyway.
+
+    If a fetch fails, the remaining ones are cancelled before the error is
+    raised, so no entity is filled after this returns.
+
+    Example:
+        >>> instances = await lxd.instance.list()
+        >>> await fetch_all(instances)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(entity: LazyEntity) -> None:
+        async with semaphore:
+            await entity.fetch()
+
+    tasks = [
+        asyncio.ensure_future(entity.fetch() if entity._batcher is not None else fetch(entity))
+        for entity in entities
+        if not entity.is_fetched
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -1,12 +1,14 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
+from ..exceptions import AioLXDValidationError
+from ..transport import AbstractTransport
 from .abc import LazyEntity
 
 
 class InstanceConfig(BaseModel):
-    security_nesting: Optional[str] = Field(alias="security.nesting")
+    security_nesting: Optional[str] = Field(default=None, alias="security.nesting")
 
 
 class InstanceDevice(BaseModel):
@@ -15,7 +17,7 @@ class InstanceDevice(BaseModel):
     type: str
 
 
-class InstanceEntity(LazyEntity):
+class InstanceSchema(BaseModel):
     architecture: str
     created_at: str
     last_used_at: str
@@ -23,7 +25,7 @@ class InstanceEntity(LazyEntity):
     name: str
     profiles: List[str]
     project: str
-    restore: Optional[str]
+    restore: Optional[str] = None
     stateful: bool
     status: str
     status_code: int
@@ -34,6 +36,24 @@ class InstanceEntity(LazyEntity):
     config: InstanceConfig
 
 
+class InstanceEntity(LazyEntity, InstanceSchema):
+    @classmethod
+    def from_list(cls, transport: AbstractTransport, items: List[Dict[str, Any]]) -> List["InstanceEntity"]:
+        """Create fetched instances from a recursive listing.
+
+        The whole list is validated with a single adapter call over the
+        instance schema, then each result is wrapped in an entity.
+        """
+        try:
+            schemas = INSTANCE_LIST_ADAPTER.validate_python(items)
+        except ValidationError as err:
+            raise AioLXDValidationError(err)
+        return [cls._from_schema(transport, schema) for schema in schemas]
+
+
+INSTANCE_LIST_ADAPTER: TypeAdapter[List[InstanceSchema]] = TypeAdapter(List[InstanceSchema])
+
+
 class InstanceSource(BaseModel):
     alias: str
     type: str = Field(default="image")
@@ -31,7 +31,22 @@ class StatusCode(Enum):
     NOT_FOUND = 404
 
 
+# Status codes by value, a dict lookup is much cheaper than calling the Enum
+_STATUS_BY_INT: Dict[int, StatusCode] = {member.value: member for member in StatusCode}
+
+
+def get_status_code(value: int) -> StatusCode:
+    """Get the status code for a value, raising ValueError if it is unknown."""
+    try:
+        return _STATUS_BY_INT[value]
+    except KeyError:
+        return StatusCode(value)
+
+
 class BaseResponse:
+    # Responses are created for every request, slots keep them small
+    __slots__ = ()
+
     type_: str
     metadata: Optional[Union[Dict[str, Any], List[Any]]]
 
@@ -41,11 +56,13 @@ class BaseResponse:
             raise ValueError("Invalid metadata type")
         if "status" not in self.metadata:
             raise ValueError("Metadata has no status")
-        return StatusCode(self.metadata["status"])
+        return get_status_code(self.metadata["status"])
 
 
 @dataclass
 class SyncResponse(BaseResponse):
+    __slots__ = ("type_", "metadata", "status", "status_code")
+
     # Duplication is required for dataclasses to work
     type_: str
     metadata: Optional[Union[Dict[str, Any], List[Any]]]
@@ -56,6 +73,8 @@ class SyncResponse(BaseResponse):
 
 @dataclass
 class AsyncResponse(BaseResponse):
+    __slots__ = ("type_", "metadata", "status", "status_code", "operation", "transport")
+
     type_: str
     metadata: Dict[str, Any]
 
@@ -76,6 +95,8 @@ class AsyncResponse(BaseResponse):
 
 @dataclass
 class ErrorResponse(BaseResponse):
+    __slots__ = ("type_", "metadata", "error", "error_code")
+
     type_: str
     metadata: Optional[Union[Dict[str, Any], List[Any]]]
 
@@ -2,9 +2,10 @@ from typing import Any, Optional
 
 from aiohttp import ClientResponse
 from aiohttp.typedefs import CIMultiDictProxy
-from pydantic.error_wrappers import ValidationError
+from pydantic import ValidationError
 
 from .entities.response import ErrorResponse
+from .utils import json_loads
 
 
 class AioLXDException(Exception):
@@ -50,8 +51,11 @@ class AioLXDResponseError(AioLXDException):
         return await self.response.text()
 
     async def json(self) -> Optional[Any]:
-        """Return response json."""
-        return await self.response.json()
+        """Return response json, or None if the response has no body."""
+        body = await self.response.read()
+        if not body.strip():
+            return None
+        return json_loads(body)
 
 
 class AioLXDValidationError(AioLXDException):
@@ -1,10 +1,31 @@
-import json
+"""Transports for the LXD API.
+
+aiohttp keeps connections alive much more efficiently on uvloop, call
+install_uvloop() before starting the event loop to use it when installed.
+"""
+
 import logging
+import re
 import ssl
+import sys
+import weakref
 from abc import ABC, abstractmethod
-from asyncio import Task, create_task
+from asyncio import Task, create_task, get_running_loop, shield
 from enum import Enum
-from typing import Any, Coroutine, Dict, Optional, Tuple, TypeVar
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import aiohttp
 
@@ -14,14 +35,54 @@ from .entities.response import (
     ErrorResponse,
     StatusCode,
     SyncResponse,
+    get_status_code,
+)
+from .exceptions import (
+    AioLXDResponseError,
+    AioLXDResponseInvalidCode,
+    AioLXDResponseNotFound,
+    AioLXDResponseTypeError,
+)
+from .utils import (
+    json_dumps,
+    json_loads,
+    make_param_appender,
+    retrieve_exception,
+    update_query_params,
 )
-from .exceptions import AioLXDResponseError, AioLXDResponseTypeError
-from .utils import update_query_params
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound="AbstractTransport")
 
+# Connector settings used when the transport creates its own session
+DEFAULT_CONNECTOR_PARAMS: Dict[str, Any] = {
+    "limit": 100,
+    "limit_per_host": 64,
+    "keepalive_timeout": 300,
+    "ttl_dns_cache": 600,
+    # Aborts TLS connections the server didn't close cleanly. Python fixed
+    # the leak in 3.12.8 and 3.13.1, aiohttp warns when it is set there.
+    "enable_cleanup_closed": sys.version_info < (3, 12, 8) or (3, 13, 0) <= sys.version_info < (3, 13, 1),
+}
+
+
+def install_uvloop() -> bool:
+    """Install uvloop as the event loop policy, if it is installed.
+
+    Event loop policies are deprecated since Python 3.12, and uvloop.install()
+    emits a DeprecationWarning there. On Python 3.12 and later, prefer running
+    the program with uvloop.run(main()) instead of calling this function.
+
+    Returns True if uvloop was installed.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
 
 class RequestMethod(Enum):
     """HTTP request methods."""
@@ -35,40 +96,119 @@ class RequestMethod(Enum):
     PATCH = "PATCH"
 
 
+# Methods that send the request data as a JSON body
+PAYLOAD_METHODS = frozenset(("POST", "PUT", "PATCH"))
+
+# Methods whose concurrent identical requests share one round trip
+COALESCED_METHODS = frozenset(("GET", "HEAD"))
+
+# JSON content types, the same ones ClientResponse.json() accepts
+_JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+
+# Appends the query parameters supported by request() to a URL
+_append_query = make_param_appender(("recursion", "filter"))
+
+
+@lru_cache(maxsize=1024)
+def _merge_query(url: str, recursion: Optional[str], filter: Optional[str]) -> str:
+    """Merge the query parameters supported by request() into a URL's query string.
+
+    Parsing the URL is the slow part of building it, and the same URLs are
+    requested over and over, so the results are cached.
+    """
+    params = {}
+    if recursion is not None:
+        params["recursion"] = recursion
+    if filter is not None:
+        params["filter"] = filter
+    return update_query_params(url, params)
+
+
+def _build_sync(response: Dict[str, Any], transport: "AbstractTransport") -> BaseResponse:
+    return SyncResponse(
+        type_="sync",
+        metadata=response["metadata"],
+        status=response["status"],
+        status_code=get_status_code(response["status_code"]),
+    )
+
+
+def _build_async(response: Dict[str, Any], transport: "AbstractTransport") -> BaseResponse:
+    return AsyncResponse(
+        type_="async",
+        metadata=response["metadata"],
+        status=response["status"],
+        status_code=get_status_code(response["status_code"]),
+        operation=response["operation"],
+        transport=transport,
+    )
+
+
+def _build_error(response: Dict[str, Any], transport: "AbstractTransport") -> BaseResponse:
+    raise AioLXDResponseTypeError(
+        ErrorResponse(
+            type_="error",
+            metadata=response["metadata"],
+            error=response["error"],
+            error_code=get_status_code(response["error_code"]),
+        )
+    )
+
+
+# Response builders by response type
+_BUILDERS: Dict[str, Callable[[Dict[str, Any], "AbstractTransport"], BaseResponse]] = {
+    "sync": _build_sync,
+    "async": _build_async,
+    "error": _build_error,
+}
+
+
 class TransportProxyCaller:
+    __slots__ = ("path", "parent", "_children")
+
     def __init__(self, path: str, parent: "AbstractTransport") -> None:
         self.path = path
         self.parent = parent
+        self._children: Optional[Dict[str, TransportProxyCaller]] = None
 
     def slash(self, name: str) -> "TransportProxyCaller":
         return TransportProxyCaller(f"{self.path}/{name}", self.parent)
 
     def __getattr__(self, name: str) -> "TransportProxyCaller":
-        return self.slash(name)
+        # Attribute names come from the source code, so there are only a few
+        # of them and their callers can be cached. Names passed to slash()
+        # are arbitrary and are not cached.
+        children = self._children
+        if children is None:
+            children = self._children = {}
+        child = children.get(name)
+        if child is None:
+            child = children[name] = self.slash(name)
+        return child
 
     def __call__(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.GET, self.path, **kwargs)
+        return self.parent.request("GET", self.path, **kwargs)
 
     def get(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.GET, self.path, **kwargs)
+        return self.parent.request("GET", self.path, **kwargs)
 
     def post(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.POST, self.path, **kwargs)
+        return self.parent.request("POST", self.path, **kwargs)
 
     def put(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.PUT, self.path, **kwargs)
+        return self.parent.request("PUT", self.path, **kwargs)
 
     def delete(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.DELETE, self.path, **kwargs)
+        return self.parent.request("DELETE", self.path, **kwargs)
 
     def options(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.OPTIONS, self.path, **kwargs)
+        return self.parent.request("OPTIONS", self.path, **kwargs)
 
     def patch(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.PATCH, self.path, **kwargs)
+        return self.parent.request("PATCH", self.path, **kwargs)
 
     def head(self, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
-        return self.parent.request(RequestMethod.HEAD, self.path, **kwargs)
+        return self.parent.request("HEAD", self.path, **kwargs)
 
 
 class AbstractTransport(ABC):
@@ -82,7 +222,7 @@ class AbstractTransport(ABC):
     @abstractmethod
     async def request(
         self,
-        method: RequestMethod,
+        method: Union[str, RequestMethod],
         path: str,
         data: Optional[Dict[str, Any]] = None,
         *,
@@ -92,7 +232,8 @@ class AbstractTransport(ABC):
         """Make a request to the LXD API.
 
         Args:
-            method: The HTTP method to use.
+            method: The HTTP method to use, as a string in any case or a
+                    RequestMethod.
             path: The path to the resource.
             data: The data to send with the request.
             recursion: Whether to recurse into sub-resources.
@@ -108,62 +249,45 @@ class AbstractTransport(ABC):
 
     def get(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a GET request to the LXD API."""
-        return self.request(RequestMethod.GET, path, **kwargs)
+        return self.request("GET", path, **kwargs)
 
     def post(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a POST request to the LXD API."""
-        return self.request(RequestMethod.POST, path, **kwargs)
+        return self.request("POST", path, **kwargs)
 
     def put(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a PUT request to the LXD API."""
-        return self.request(RequestMethod.PUT, path, **kwargs)
+        return self.request("PUT", path, **kwargs)
 
     def delete(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a DELETE request to the LXD API."""
-        return self.request(RequestMethod.DELETE, path, **kwargs)
+        return self.request("DELETE", path, **kwargs)
 
     def patch(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a PATCH request to the LXD API."""
-        return self.request(RequestMethod.PATCH, path, **kwargs)
+        return self.request("PATCH", path, **kwargs)
 
     def head(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a HEAD request to the LXD API."""
-        return self.request(RequestMethod.HEAD, path, **kwargs)
+        return self.request("HEAD", path, **kwargs)
 
     def options(self, path: str, **kwargs: Any) -> Coroutine[Any, Any, BaseResponse]:
         """Make a OPTIONS request to the LXD API."""
-        return self.request(RequestMethod.OPTIONS, path, **kwargs)
+        return self.request("OPTIONS", path, **kwargs)
 
     def _process_response(self, response: Dict[str, Any]) -> BaseResponse:
         """Process a response from the LXD API."""
-        if "type" not in response:
+        try:
+            type_ = response["type"]
+        except KeyError:
             raise ValueError("Response has no type")
 
-        args: Dict[str, Any] = {
-            "type_": response["type"],
-            "metadata": response["metadata"],
-        }
-
-        ret: Optional[BaseResponse] = None
-
-        if response["type"] == "sync" or response["type"] == "async":
-            args["status"] = response["status"]
-            args["status_code"] = StatusCode(response["status_code"])
-            if response["type"] == "async":
-                args["operation"] = response["operation"]
-                ret = AsyncResponse(**args, transport=self)
-            else:
-                ret = SyncResponse(**args)
-        elif response["type"] == "error":
-            args["error"] = response["error"]
-            args["error_code"] = StatusCode(response["error_code"])
-            ret = ErrorResponse(**args)
-            raise AioLXDResponseTypeError(ret)
-
-        if ret is None:
-            raise ValueError(f"Invalid response type: {response['type']}")
+        try:
+            builder = _BUILDERS[type_]
+        except KeyError:
+            raise ValueError(f"Invalid response type: {type_}")
 
-        return ret
+        return builder(response, self)
 
     def _process_ws_response(self, response: Dict[str, Any]) -> None:
         logger.debug("Received websocket event: %s", response)
@@ -192,84 +316,307 @@ class AbstractTransport(ABC):
         await self.close()
 
     def __getattr__(self, name: str) -> TransportProxyCaller:
-        """Return a proxy caller for the given path."""
-        return TransportProxyCaller("/1.0/" + name, self)
+        """Return a proxy caller for the given path.
+
+        The caller is stored on the instance, so next lookups of the same
+        name don't go through this method.
+        """
+        caller = TransportProxyCaller("/1.0/" + name, self)
+        object.__setattr__(self, name, caller)
+        return caller
 
 
 class AsyncTransport(AbstractTransport):
+    """Transport that talks to the LXD API with aiohttp.
+
+    When no session is given, one is created with a connector tuned for a
+    single LXD host: idle connections are kept for a long time, so that
+    polling and repeated calls don't pay for new TCP and TLS handshakes.
+    The connector settings can be overridden with `connector_params`.
+    A user-supplied session is used as is and should keep connections
+    alive as well.
+
+    Transports created in the same event loop for the same URL and
+    credentials share one session, and with it the pool of open
+    connections. The session is closed with the last of them. Transports
+    that are dropped without being closed stop sharing it, and sessions of
+    closed event loops are forgotten, so the cache never keeps them alive.
+
+    With `coalesce_requests=True`, identical GET and HEAD requests made
+    while one of them is in flight share its round trip. All callers then
+    get the same response object, which they must not modify, and a
+    request started after a write may get data read before that write, as
+    long as an identical older request is still in flight.
+    """
+
+    # Shared sessions: key -> [session, number of transports using it]
+    _session_cache: ClassVar[Dict[Tuple[Any, ...], List[Any]]] = {}
+
     def __init__(
         self,
         url: str,
         session: Optional[aiohttp.ClientSession] = None,
         cert: Optional[Tuple[str, str]] = None,
         verify: Optional[bool] = None,
+        connector_params: Optional[Dict[str, Any]] = None,
+        coalesce_requests: bool = False,
         **kwargs: Any,
     ) -> None:
         self._url = url
         self._kwargs = kwargs
+        self._coalesce_requests = coalesce_requests
+        # In-flight requests by (method, url)
+        self._inflight: Dict[Tuple[str, str], "Task[BaseResponse]"] = {}
 
-        session_args = {}
-        if cert is not None:
-            ssl_context = ssl.SSLContext()
-            ssl_context.load_cert_chain(*cert)
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            session_args["connector"] = connector
-
-        self._session = session or aiohttp.ClientSession(**session_args)  # type: ignore
         self._session_owner = session is None
-        if verify is not None:
-            self._session.verify_ssl = verify
+        self._session_finalizer: Optional[weakref.finalize] = None
+        if session is None:
+            key = self._get_session_key(url, cert, verify, connector_params)
+            if key is None:
+                session = self._create_session(cert, verify, connector_params)
+            else:
+                self._prune_session_cache()
+                entry = self._session_cache.get(key)
+                if entry is not None and not entry[0].closed:
+                    session = entry[0]
+                    entry[1] += 1
+                else:
+                    session = self._create_session(cert, verify, connector_params)
+                    self._session_cache[key] = [session, 1]
+                # Releases the session on close(), or when the transport is
+                # dropped without being closed
+                self._session_finalizer = weakref.finalize(self, self._release_session, key, session)
+        self._session = session
+        # Bound once, every request goes through it
+        self._session_request = session.request
+
+    @classmethod
+    def _prune_session_cache(cls) -> None:
+        """Drop the shared sessions of event loops that are closed."""
+        for key in [key for key in cls._session_cache if key[0].is_closed()]:
+            del cls._session_cache[key]
+
+    @classmethod
+    def _release_session(cls, key: Tuple[Any, ...], session: aiohttp.ClientSession) -> bool:
+        """Release a shared session, return True if it is no longer used."""
+        entry = cls._session_cache.get(key)
+        if entry is None or entry[0] is not session:
+            return True
+        entry[1] -= 1
+        if entry[1] > 0:
+            return False
+        del cls._session_cache[key]
+        return True
+
+    @staticmethod
+    def _get_session_key(
+        url: str, cert: Optional[Tuple[str, str]], verify: Optional[bool], connector_params: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[Any, ...]]:
+        """Return the key under which the session can be shared, if it can.
+
+        Sessions are bound to their event loop. Only sessions with the default
+        connector settings are shared, custom ones may not be hashable.
+        """
+        if connector_params is not None:
+            return None
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            return None
+        return (loop, url, cert, verify)
+
+    @staticmethod
+    def _create_session(
+        cert: Optional[Tuple[str, str]], verify: Optional[bool], connector_params: Optional[Dict[str, Any]]
+    ) -> aiohttp.ClientSession:
+        """Create a session with a connector tuned for a single LXD host."""
+        connector_args = {**DEFAULT_CONNECTOR_PARAMS, **(connector_params or {})}
+        connector_args.setdefault("ssl", AsyncTransport._create_ssl_context(cert, verify))
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(**connector_args), json_serialize=json_dumps)
+
+    @staticmethod
+    def _create_ssl_context(cert: Optional[Tuple[str, str]], verify: Optional[bool]) -> ssl.SSLContext:
+        """Create the client SSL context.
+
+        LXD servers usually have self-signed certificates, so when a client
+        certificate is given the server certificate is only verified if
+        `verify` is True. Without one, it is verified unless `verify` is False.
+        """
+        ssl_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+        # LXD speaks HTTP/1.1, say so up front
+        ssl_context.set_alpn_protocols(["http/1.1"])
+        if verify is False or (cert is not None and verify is None):
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
         if cert is not None:
-            self._session.cert = cert
+            ssl_context.load_cert_chain(*cert)
+        return ssl_context
 
     async def request(
         self,
-        method: RequestMethod,
+        method: Union[str, RequestMethod],
         path: str,
         data: Optional[Dict[str, Any]] = None,
         *,
         recursion: Optional[bool] = None,
         filter: Optional[str] = None,
     ) -> BaseResponse:
-        # Prepare request
-        args = {}
-        if data is not None and method.value in ("POST", "PUT", "PATCH"):
-            args["json"] = data
-
-        # Update URL with query parameters
+        # Update URL with query parameters. Only a path that already has a
+        # query string needs to be parsed, otherwise they are appended. A lone
+        # recursion flag, the common case, is appended directly.
         url = f"{self._url}{path}"
-        if any((recursion is not None, filter is not None)):
-            params = {}
-            if recursion is not None:
-                params["recursion"] = "1" if recursion else "0"
-            if filter is not None:
-                params["filter"] = filter
-            url = update_query_params(url, params)
+        if recursion is not None or filter is not None:
+            recursion_param = None if recursion is None else "1" if recursion else "0"
+            if "?" in path:
+                url = _merge_query(url, recursion_param, filter)
+            elif filter is None:
+                url += "?recursion=1" if recursion else "?recursion=0"
+            else:
+                url = _append_query(url, recursion_param, filter)
+
+        if isinstance(method, RequestMethod):
+            method = method.value
+        else:
+            method = method.upper()
+
+        if data is not None or not self._coalesce_requests or method not in COALESCED_METHODS:
+            return await self._send(method, url, data)
+
+        # Share the request with identical ones already in flight. The task is
+        # shielded so that a cancelled caller doesn't cancel it for the others,
+        # and its error is marked as retrieved in case all callers were.
+        key = (method, url)
+        task = self._inflight.get(key)
+        if task is None:
+            task = create_task(self._send(method, url, None))
+            self._inflight[key] = task
+
+            def done(task: "Task[BaseResponse]") -> None:
+                self._inflight.pop(key, None)
+                retrieve_exception(task)
+
+            task.add_done_callback(done)
+        return await shield(task)
+
+    async def _send(self, method: str, url: str, data: Optional[Dict[str, Any]]) -> BaseResponse:
+        """Make a request and process its response."""
+        # Checked once, so requests don't pay for three debug calls
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Making %s request to %s", method, url)
+
+        # Make request. Most requests have no body, those pass the stored
+        # keyword arguments as is instead of merging them into a new dict.
+        if data is not None and method in PAYLOAD_METHODS:
+            response = await self._session_request(method, url, json=data, **self._kwargs)
+        else:
+            response = await self._session_request(method, url, **self._kwargs)
+
+        if debug:
+            logger.debug("Received response from %s: %s", url, response.status)
 
-        logger.debug("Making %s request to %s", method.value, url)
+        if response.status >= 500:
+            raise AioLXDResponseError(response, detail=f"Server error: {response.status} {response.reason}")
 
-        # Make request
-        response = await self._session.request(method.value, url, **self._kwargs, **args)
+        # HEAD responses have no body to decode, the status is all there is
+        if method == "HEAD":
+            response.release()
+            if response.status == 404:
+                raise AioLXDResponseNotFound(response)
+            if response.status >= 400:
+                raise AioLXDResponseInvalidCode(response)
+            return SyncResponse(type_="sync", metadata={}, status=response.reason or "", status_code=StatusCode.SUCCESS)
+
+        obj = await self._read_json(response)
+        if debug:
+            logger.debug("Response from %s: %s", url, obj)
 
-        logger.debug("Received response from %s: %s", url, response.status)
+        return self._process_response(obj)
 
-        if response.status >= 500:
-            raise AioLXDResponseError(response, detail=f"Server error: {response.status} {response.reason}")
+    @staticmethod
+    async def _read_json(response: aiohttp.ClientResponse) -> Any:
+        """Read and decode the JSON envelope of a response.
 
-        # Process response
+        The envelope is decoded straight from the body bytes, without the
+        text decoding step of ClientResponse.json().
+        """
         try:
-            obj = await response.json()
-            logger.debug("Response from %s: %s", url, obj)
-        except aiohttp.ContentTypeError:
+            body = await response.read()
+        except aiohttp.ClientError:
+            raise AioLXDResponseError(response)
+        if _JSON_CONTENT_TYPE.match(response.content_type) is None:
             raise AioLXDResponseError(
                 response, detail=f"Response is not JSON: {response.content_type} while expecting application/json"
             )
-        except aiohttp.ClientError:
-            raise AioLXDResponseError(response)
-        except json.JSONDecodeError as e:
+        try:
+            return json_loads(body)
+        except ValueError as e:
             raise AioLXDResponseError(response, detail=f"Response is not JSON: Failed to decode JSON: {e}")
 
-        return self._process_response(obj)
+    async def request_stream(
+        self,
+        method: Union[str, RequestMethod],
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        *,
+        ndjson: bool = True,
+    ) -> AsyncIterator[Any]:
+        """Make a request and iterate over its response body as it arrives.
+
+        With `ndjson`, the body is read as newline-delimited JSON and every
+        line is yielded decoded, otherwise raw chunks of bytes are yielded.
+        Errors are raised as by request(): AioLXDResponseTypeError with the
+        decoded error for client errors, AioLXDResponseError otherwise.
+        """
+        if isinstance(method, RequestMethod):
+            method = method.value
+        else:
+            method = method.upper()
+        url = f"{self._url}{path}"
+        logger.debug("Making %s stream request to %s", method, url)
+
+        if data is not None and method in PAYLOAD_METHODS:
+            context = self._session_request(method, url, json=data, **self._kwargs)
+        else:
+            context = self._session_request(method, url, **self._kwargs)
+
+        async with context as response:
+            if response.status >= 500:
+                raise AioLXDResponseError(response, detail=f"Server error: {response.status} {response.reason}")
+            # Client errors carry an error envelope, raised as by request()
+            if response.status >= 400:
+                self._process_response(await self._read_json(response))
+                raise AioLXDResponseError(response, detail=f"Error response: {response.status} {response.reason}")
+
+            # Incomplete line carried over between chunks. Only the new data
+            # is searched for line breaks, so long lines stay linear.
+            buffer = bytearray()
+            try:
+                async for chunk, _ in response.content.iter_chunks():
+                    if not ndjson:
+                        yield chunk
+                        continue
+                    start = 0
+                    buffer += chunk
+                    end = buffer.find(b"\n", len(buffer) - len(chunk))
+                    while end != -1:
+                        line = bytes(buffer[start:end])
+                        if line.strip():
+                            yield self._decode_stream_line(response, line)
+                        start = end + 1
+                        end = buffer.find(b"\n", start)
+                    del buffer[:start]
+            except aiohttp.ClientError:
+                raise AioLXDResponseError(response)
+            if buffer.strip():
+                yield self._decode_stream_line(response, bytes(buffer))
+
+    @staticmethod
+    def _decode_stream_line(response: aiohttp.ClientResponse, line: bytes) -> Any:
+        try:
+            return json_loads(line)
+        except ValueError as e:
+            raise AioLXDResponseError(response, detail=f"Response is not JSON: Failed to decode JSON: {e}")
 
     async def websocket(self) -> None:
         while True:
@@ -278,9 +625,9 @@ class AsyncTransport(AbstractTransport):
                 async with self._session.ws_connect(self._url + "/1.0/events") as ws:
                     async for msg in ws:
                         try:
-                            data = json.loads(msg.data)
+                            data = json_loads(msg.data)
                             self._process_ws_response(data)
-                        except json.JSONDecodeError as e:
+                        except ValueError as e:
                             logger.error(f"Failed to decode JSON: {e}")
                             continue
             except Exception as e:
@@ -288,5 +635,10 @@ class AsyncTransport(AbstractTransport):
 
     async def close(self) -> None:
         await super().close()
-        if self._session_owner:
-            await self._session.close()
+        if not self._session_owner:
+            return
+        self._session_owner = False
+        # A shared session is closed by the last transport that uses it
+        if self._session_finalizer is not None and not self._session_finalizer():
+            return
+        await self._session.close()
@@ -0,0 +1,122 @@
+import asyncio
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from aiolxd import LXD, AsyncTransport
+
+
+def make_instance(name: str, project: str = "default") -> Dict[str, Any]:
+    return {
+        "architecture": "x86_64",
+        "created_at": "2023-02-07T13:05:12Z",
+        "last_used_at": "1970-01-01T00:00:00Z",
+        "location": "none",
+        "name": name,
+        "profiles": ["default"],
+        "project": project,
+        "stateful": False,
+        "status": "Stopped",
+        "status_code": 102,
+        "type": "container",
+        "description": "",
+        "devices": {"root": {"path": "/", "pool": "default", "type": "disk"}},
+        "ephemeral": False,
+        "config": {},
+    }
+
+
+def sync_response(metadata: Any, content_type: str = "application/json") -> web.Response:
+    return web.json_response(
+        {"type": "sync", "status": "Success", "status_code": 200, "metadata": metadata}, content_type=content_type
+    )
+
+
+class FakeLXD:
+    """Minimal LXD API server that records the requests it gets."""
+
+    def __init__(self) -> None:
+        # Instances by (project, name)
+        self.instances: Dict[Any, Dict[str, Any]] = {}
+        # Operations returned by a listing without recursion, all instances if None
+        self.listing: Optional[List[str]] = None
+        self.fail_listing = False
+        self.delay = 0.0
+        self.content_type = "application/json"
+        # Body of /1.0/stream, written one chunk at a time
+        self.stream_chunks: List[bytes] = []
+        self.hits: Counter[str] = Counter()
+        # Query parameters of every listing, in the order they were sent
+        self.list_queries: List[List[Tuple[str, str]]] = []
+        self.server: Optional[TestServer] = None
+
+    def add_instance(self, name: str, project: str = "default") -> None:
+        self.instances[project, name] = make_instance(name, project)
+
+    @property
+    def url(self) -> str:
+        assert self.server is not None
+        return str(self.server.make_url("")).rstrip("/")
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/1.0/instances", self.list_instances)
+        app.router.add_route("*", "/1.0/instances/{name}", self.get_instance)
+        app.router.add_get("/1.0/stream", self.stream)
+        return app
+
+    async def stream(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for chunk in self.stream_chunks:
+            await response.write(chunk)
+            # Let the client receive every chunk on its own
+            await asyncio.sleep(0.001)
+        await response.write_eof()
+        return response
+
+    async def list_instances(self, request: web.Request) -> web.Response:
+        recursion = request.query.get("recursion") == "1"
+        self.hits["list1" if recursion else "list"] += 1
+        self.list_queries.append(list(request.query.items()))
+        if self.fail_listing:
+            return web.Response(status=500, reason="Listing failed")
+        project = request.query.get("project", "default")
+        instances = [instance for (p, _), instance in self.instances.items() if p == project]
+        if recursion:
+            return sync_response(instances)
+        if self.listing is not None:
+            return sync_response(self.listing)
+        return sync_response([f"/1.0/instances/{instance['name']}" for instance in instances])
+
+    async def get_instance(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        project = request.query.get("project", "default")
+        self.hits[f"{request.method} {name}"] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        instance = self.instances.get((project, name))
+        if instance is None:
+            return web.json_response(
+                {"type": "error", "error": "not found", "error_code": 404, "metadata": None}, status=404
+            )
+        return sync_response(instance, self.content_type)
+
+
+@pytest.fixture
+async def fake_lxd() -> AsyncIterator[FakeLXD]:
+    fake = FakeLXD()
+    fake.server = TestServer(fake.make_app())
+    await fake.server.start_server()
+    yield fake
+    await fake.server.close()
+
+
+@pytest.fixture
+async def lxd(fake_lxd: FakeLXD) -> AsyncIterator[LXD]:
+    client = LXD(AsyncTransport(fake_lxd.url))
+    yield client
+    await client.transport.close()
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from aiolxd import LXD, fetch_all
+from aiolxd.entities.instance import InstanceEntity
+from aiolxd.exceptions import AioLXDResponseError, AioLXDValidationError
+
+from .conftest import FakeLXD, make_instance
+
+
+async def test_recursive_listing_returns_fetched_entities(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    fake_lxd.add_instance("b")
+    instances = await lxd.instance.list(recursion=True)
+
+    assert [instance.name for instance in instances] == ["a", "b"]
+    assert all(instance.is_fetched for instance in instances)
+    assert instances[0]._transport is lxd.transport
+    assert instances[0].devices["root"].pool == "default"
+    assert repr(instances[0]).startswith("InstanceEntity(architecture=")
+
+
+def test_from_list_matches_single_construction() -> None:
+    data = make_instance("a")
+    listed = InstanceEntity.from_list(None, [data])[0]  # type: ignore[arg-type]
+    single = InstanceEntity(None, data=data)  # type: ignore[arg-type]
+
+    assert listed.model_dump() == single.model_dump()
+    assert listed.model_fields_set == single.model_fields_set
+
+    listed.fill(make_instance("b"))
+    assert listed.name == "b"
+
+
+def test_from_list_raises_validation_error() -> None:
+    with pytest.raises(AioLXDValidationError):
+        InstanceEntity.from_list(None, [make_instance("a"), {"name": "b"}])  # type: ignore[arg-type]
+
+
+async def test_fetch_all_cancels_remaining_fetches_on_error(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    fake_lxd.delay = 0.05
+    for name in ("a", "b", "c"):
+        fake_lxd.add_instance(name)
+    operations = ["/1.0/missing", "/1.0/instances/a", "/1.0/instances/b", "/1.0/instances/c"]
+    instances = InstanceEntity.from_operations(lxd.transport, operations)
+
+    with pytest.raises(AioLXDResponseError):
+        await fetch_all(instances)
+
+    others = asyncio.all_tasks() - {asyncio.current_task()}
+    assert not any("fetch" in task.get_coro().__qualname__ for task in others)
+    # Nothing is filled once the server would have answered the other fetches
+    await asyncio.sleep(0.1)
+    assert not any(instance.is_fetched for instance in instances)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from aiolxd import LXD, fetch_all
+from aiolxd.exceptions import AioLXDResponseError
+
+from .conftest import FakeLXD
+
+
+@pytest.fixture
+def instances(fake_lxd: FakeLXD) -> None:
+    for name in ("a", "b", "c", "d"):
+        fake_lxd.add_instance(name)
+
+
+@pytest.mark.usefixtures("instances")
+async def test_batching_is_off_by_default(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    entities = await lxd.instance.list()
+    await fetch_all(entities)
+
+    assert [entity.name for entity in entities] == ["a", "b", "c", "d"]
+    assert fake_lxd.hits["list1"] == 0
+    assert fake_lxd.hits["GET a"] == 1
+
+
+@pytest.mark.usefixtures("instances")
+async def test_concurrent_fetches_share_one_listing(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    lxd.instance.fetch_batch_window = 0.01
+    entities = await lxd.instance.list()
+    await asyncio.gather(*(entity.fetch() for entity in entities))
+
+    assert [entity.name for entity in entities] == ["a", "b", "c", "d"]
+    assert all(entity.is_fetched for entity in entities)
+    assert fake_lxd.hits["list1"] == 1
+    assert not any(key.startswith("GET ") for key in fake_lxd.hits)
+
+
+@pytest.mark.usefixtures("instances")
+async def test_few_fetches_are_not_batched(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    lxd.instance.fetch_batch_window = 0.01
+    lxd.instance.fetch_batch_threshold = 0.75
+    entities = await lxd.instance.list()
+    await asyncio.gather(entities[0].fetch(), entities[1].fetch())
+
+    assert entities[0].name == "a" and entities[1].name == "b"
+    assert not entities[2].is_fetched
+    assert fake_lxd.hits["list1"] == 0
+    assert fake_lxd.hits["GET a"] == fake_lxd.hits["GET b"] == 1
+
+
+@pytest.mark.usefixtures("instances")
+async def test_operations_missing_from_listing_are_fetched_alone(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("e", project="other")
+    fake_lxd.listing = ["/1.0/instances/a", "/1.0/instances/b", "/1.0/instances/e?project=other"]
+    lxd.instance.fetch_batch_window = 0.01
+    entities = await lxd.instance.list()
+    await asyncio.gather(*(entity.fetch() for entity in entities))
+
+    assert [(entity.name, entity.project) for entity in entities] == [
+        ("a", "default"),
+        ("b", "default"),
+        ("e", "other"),
+    ]
+    assert fake_lxd.hits["list1"] == 1
+    assert fake_lxd.hits["GET e"] == 1
+    assert fake_lxd.hits["GET a"] == 0
+
+
+@pytest.mark.usefixtures("instances")
+async def test_listing_failure_fails_every_fetch(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    lxd.instance.fetch_batch_window = 0.01
+    entities = await lxd.instance.list()
+    fake_lxd.fail_listing = True
+    results = await asyncio.gather(*(entity.fetch() for entity in entities), return_exceptions=True)
+
+    assert len(results) == 4
+    assert all(isinstance(result, AioLXDResponseError) for result in results)
+    assert not any(entity.is_fetched for entity in entities)
+
+
+@pytest.mark.usefixtures("instances")
+async def test_failure_after_cancelled_fetches_is_retrieved(lxd: LXD, fake_lxd: FakeLXD) -> None:
+    lxd.instance.fetch_batch_window = 0.01
+    entities = await lxd.instance.list()
+    fake_lxd.fail_listing = True
+    tasks = [asyncio.create_task(entity.fetch()) for entity in entities]
+    await asyncio.sleep(0)
+    futures = list(entities[0]._batcher._pending.values())  # type: ignore[union-attr]
+    for task in tasks:
+        task.cancel()
+    await asyncio.sleep(0.05)
+
+    assert fake_lxd.hits["list1"] == 1
+    # Nobody awaits the futures anymore, asyncio must not report their errors
+    assert not any(future._log_traceback for future in futures)  # type: ignore[attr-defined]
+    assert all(isinstance(future.exception(), AioLXDResponseError) for future in futures)
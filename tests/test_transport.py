@@ -0,0 +1,211 @@
+import asyncio
+import gc
+from typing import List, Optional, Tuple
+
+import pytest
+
+from aiolxd import AsyncTransport
+from aiolxd.exceptions import AioLXDResponseError, AioLXDResponseTypeError
+
+from .conftest import FakeLXD
+
+
+async def test_transports_share_session_until_last_close(fake_lxd: FakeLXD) -> None:
+    first = AsyncTransport(fake_lxd.url)
+    second = AsyncTransport(fake_lxd.url)
+    other = AsyncTransport(fake_lxd.url, verify=False)
+    assert first._session is second._session
+    assert other._session is not first._session
+    session = first._session
+
+    await first.close()
+    await first.close()
+    assert not session.closed
+    await second.close()
+    assert session.closed
+    await other.close()
+    assert AsyncTransport._session_cache == {}
+
+
+async def test_dropped_transport_releases_session(fake_lxd: FakeLXD) -> None:
+    transport = AsyncTransport(fake_lxd.url)
+    session = transport._session
+    del transport
+    gc.collect()
+    assert AsyncTransport._session_cache == {}
+
+    transport = AsyncTransport(fake_lxd.url)
+    assert transport._session is not session
+    await transport.close()
+    await session.close()
+
+
+def test_sessions_of_closed_loops_are_dropped() -> None:
+    async def leak_transport() -> AsyncTransport:
+        transport = AsyncTransport("http://127.0.0.1:1")
+        # Close the session behind the transport's back, it stays cached
+        await transport._session.close()
+        return transport
+
+    async def make_transport() -> None:
+        transport = AsyncTransport("http://127.0.0.1:1")
+        assert len(AsyncTransport._session_cache) == 1
+        await transport.close()
+
+    loop = asyncio.new_event_loop()
+    leaked = loop.run_until_complete(leak_transport())
+    loop.close()
+    assert len(AsyncTransport._session_cache) == 1
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(make_transport())
+    loop.close()
+    assert AsyncTransport._session_cache == {}
+    del leaked
+
+
+@pytest.mark.parametrize(
+    "recursion, filter, expected",
+    [
+        (True, None, [("recursion", "1")]),
+        (False, None, [("recursion", "0")]),
+        (True, "name eq a&b", [("recursion", "1"), ("filter", "name eq a&b")]),
+        (None, "name eq a&b", [("filter", "name eq a&b")]),
+    ],
+)
+@pytest.mark.parametrize("project", [None, "p"])
+async def test_query_parameters_reach_the_server(
+    fake_lxd: FakeLXD,
+    recursion: Optional[bool],
+    filter: Optional[str],
+    expected: List[Tuple[str, str]],
+    project: Optional[str],
+) -> None:
+    path = "/1.0/instances" if project is None else f"/1.0/instances?project={project}"
+    transport = AsyncTransport(fake_lxd.url)
+    await transport.request("GET", path, recursion=recursion, filter=filter)
+    await transport.close()
+
+    if project is not None:
+        expected = [("project", project)] + expected
+    assert fake_lxd.list_queries == [expected]
+
+
+async def test_lowercase_methods_are_accepted(fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    transport = AsyncTransport(fake_lxd.url)
+    head = await transport.request("head", "/1.0/instances/a")
+    get = await transport.request("get", "/1.0/instances/a")
+    await transport.close()
+
+    assert head.metadata == {}
+    assert get.metadata["name"] == "a"
+    assert fake_lxd.hits["HEAD a"] == fake_lxd.hits["GET a"] == 1
+
+
+async def test_requests_are_not_coalesced_by_default(fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    transport = AsyncTransport(fake_lxd.url)
+    await asyncio.gather(*(transport.instances.slash("a").get() for _ in range(3)))
+    await transport.close()
+
+    assert fake_lxd.hits["GET a"] == 3
+
+
+async def test_identical_concurrent_gets_share_one_request(fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    fake_lxd.delay = 0.05
+    transport = AsyncTransport(fake_lxd.url, coalesce_requests=True)
+    responses = await asyncio.gather(*(transport.instances.slash("a").get() for _ in range(5)))
+
+    assert fake_lxd.hits["GET a"] == 1
+    assert all(response is responses[0] for response in responses)
+    assert transport._inflight == {}
+
+    await transport.instances.slash("a").get()
+    await transport.close()
+    assert fake_lxd.hits["GET a"] == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_coalesced_request(fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    fake_lxd.delay = 0.05
+    transport = AsyncTransport(fake_lxd.url, coalesce_requests=True)
+    tasks = [asyncio.create_task(transport.instances.slash("a").get()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    tasks[0].cancel()
+    responses = await asyncio.gather(*tasks[1:])
+    await transport.close()
+
+    assert tasks[0].cancelled()
+    assert [response.metadata["name"] for response in responses] == ["a", "a"]
+    assert fake_lxd.hits["GET a"] == 1
+
+
+async def test_failed_coalesced_request_without_waiters_is_not_reported(fake_lxd: FakeLXD) -> None:
+    errors = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    fake_lxd.delay = 0.05
+    transport = AsyncTransport(fake_lxd.url, coalesce_requests=True)
+    task = asyncio.create_task(transport.instances.slash("missing").get())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.sleep(0.1)
+    await transport.close()
+    del task
+    gc.collect()
+    loop.set_exception_handler(None)
+
+    assert transport._inflight == {}
+    assert errors == []
+
+
+async def test_stream_yields_lines_split_across_chunks(fake_lxd: FakeLXD) -> None:
+    long_value = "x" * 100_000
+    body = b'{"i": 0}\n\n{"i": 1, "long": "' + long_value.encode() + b'"}\n{"i": 2}'
+    fake_lxd.stream_chunks = [body[i : i + 1000] for i in range(0, len(body), 1000)]
+    transport = AsyncTransport(fake_lxd.url)
+    lines = [line async for line in transport.request_stream("GET", "/1.0/stream")]
+    chunks = [chunk async for chunk in transport.request_stream("GET", "/1.0/stream", ndjson=False)]
+    await transport.close()
+
+    assert lines == [{"i": 0}, {"i": 1, "long": long_value}, {"i": 2}]
+    assert b"".join(chunks) == body
+
+
+async def test_stream_client_error_raises_decoded_error(fake_lxd: FakeLXD) -> None:
+    transport = AsyncTransport(fake_lxd.url)
+    with pytest.raises(AioLXDResponseTypeError) as error:
+        async for _ in transport.request_stream("GET", "/1.0/instances/missing"):
+            pass
+    fake_lxd.fail_listing = True
+    with pytest.raises(AioLXDResponseError):
+        async for _ in transport.request_stream("GET", "/1.0/instances"):
+            pass
+    await transport.close()
+
+    assert error.value.error.error == "not found"
+
+
+async def test_error_without_body_has_no_json(fake_lxd: FakeLXD) -> None:
+    fake_lxd.fail_listing = True
+    transport = AsyncTransport(fake_lxd.url)
+    with pytest.raises(AioLXDResponseError) as error:
+        await transport.request("GET", "/1.0/instances")
+    await transport.close()
+
+    assert await error.value.json() is None
+
+
+async def test_json_content_types_are_accepted(fake_lxd: FakeLXD) -> None:
+    fake_lxd.add_instance("a")
+    transport = AsyncTransport(fake_lxd.url)
+    fake_lxd.content_type = "application/vnd.lxd+json"
+    response = await transport.instances.slash("a").get()
+    assert response.metadata["name"] == "a"
+
+    fake_lxd.content_type = "text/plain"
+    with pytest.raises(AioLXDResponseError, match="Response is not JSON"):
+        await transport.instances.slash("a").get()
+    await transport.close()